@@ -11,7 +11,7 @@ def help():
     xc.help()
     xc.CommonTools.my_path.extra_search_paths.append("a-path-with-data-files")
     xc.CatSim(cfgFile0, cfgFile1, cfgFile2, ...)
-    xc.GetMu(materialFile, Evec)
+    xc.GetMu(materialFile, Evec[, out])
     xc.rawread(fname, dataShape, dataType)
     xc.rawwrite(fname, data)
     xc.check_value(var)
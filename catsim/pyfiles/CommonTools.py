@@ -3,7 +3,6 @@ import ctypes
 
 import json
 import os
-import struct
 
 import numpy as np
 
@@ -319,23 +318,18 @@ def get_vector_boundaries(x):
 def rawread(fname, dataShape, dataType):
     # dataType is for numpy, ONLY allows: 'float'/'single', 'double', 'int'/'int32', 'uint'/'uint32', 'int8', 'int16' 
     #          they are single, double, int32, uin32, int8, int16
-    with open(fname, 'rb') as fin:
-        data = fin.read()
-    
-    # https://docs.python.org/3/library/struct.html
-    switcher = {'float': ['f', 4, np.single], 
-                'single': ['f', 4, np.single], 
-                'double': ['d', 8, np.double], 
-                'int': ['i', 4, np.int32], 
-                'uint': ['I', 4, np.uint32],  
-                'int32': ['i', 4, np.int32], 
-                'uint32': ['I', 4, np.uint32], 
-                'int8': ['b', 1, np.int8], 
-                'int16': ['h', 2, np.int16]}
-    fmt = switcher[dataType]
-    data = struct.unpack("%d%s" % (len(data)/fmt[1], fmt[0]), data)
-    
-    data = np.array(data, dtype=fmt[2])
+    switcher = {'float': np.single, 
+                'single': np.single, 
+                'double': np.double, 
+                'int': np.int32, 
+                'uint': np.uint32,  
+                'int32': np.int32, 
+                'uint32': np.uint32, 
+                'int8': np.int8, 
+                'int16': np.int16}
+
+    # Read straight into an array of the requested type, e.g. projection data stays float32.
+    data = np.fromfile(fname, dtype=switcher[dataType])
     if dataShape:
         data = data.reshape(dataShape)
     
@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 from catsim.pyfiles.CommonTools import *
 
 def Detection_Flux(cfg):
@@ -19,10 +18,10 @@ def Detection_Flux(cfg):
     
     ###------- air or phantom scan
     detActiveArea = cfg.det.activeArea*cfg.det.cosBetas # mm^2
-    detActiveArea = nm.repmat(detActiveArea, 1, cfg.spec.nEbin)
+    detActiveArea = np.tile(detActiveArea, (1, cfg.spec.nEbin))
     
     distanceFactor = np.square(1000/cfg.det.rayDistance) # mm
-    distanceFactor = nm.repmat(distanceFactor, 1, cfg.spec.nEbin)
+    distanceFactor = np.tile(distanceFactor, (1, cfg.spec.nEbin))
     
     cfg.spec.netIvec = cfg.spec.Ivec*cfg.src.filterTrans
     cfg.detFlux = np.single(cfg.spec.netIvec*detActiveArea*distanceFactor)
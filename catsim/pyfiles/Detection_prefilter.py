@@ -1,23 +1,29 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
-from catsim.pyfiles.GetMu import GetMu
-from catsim.pyfiles.CommonTools import *
+import numpy as np
+from catsim.pyfiles.GetMu import GetMuBatch
+from catsim.pyfiles.CommonTools import CFG, source_cfg, feval, check_value
 
 def Detection_prefilter( cfg ):
     # Wvec dim: [pixel, Ebin] ([col, row, Ebin])
     
     Evec = cfg.sim.Evec
-    Wvec = np.ones(Evec.shape, dtype=np.single)
     
-    if hasattr(cfg.scanner, "detectorPrefilter"):
-        for ii in range(round(len(cfg.scanner.detectorPrefilter)/2)):
-            material = cfg.scanner.detectorPrefilter[2*ii]
-            depth = cfg.scanner.detectorPrefilter[2*ii+1]
-            mu = GetMu(material, Evec)
-            Wvec = Wvec*np.exp(-mu*depth*0.1)
-    Wvec = nm.repmat(Wvec, cfg.det.totalNumCells, 1)
-    Wvec = Wvec.astype(np.single)
+    # mu of all layers as [layer, Ebin] in one batch, then total attenuation = depths @ mus and a single exp
+    # detectorPrefilter is [material0, depth0, material1, depth1, ...]
+    prefilter = getattr(cfg.scanner, "detectorPrefilter", [])
+    if len(prefilter) % 2:
+        raise Exception("detectorPrefilter must hold (material, depth) pairs: %s" % (prefilter,))
+    materials = prefilter[0::2]
+    depths = np.array(prefilter[1::2], dtype=np.single)
+    mus = GetMuBatch(materials, Evec)
+    # fold -0.1 into the (short) depth vector and take exp in place: no full-length temporaries
+    # all operands are float32, so Wvec is float32 without a final cast
+    depths *= np.single(-0.1)
+    Wvec = depths @ mus
+    np.exp(Wvec, out=Wvec)
+    # all cells share the same weights: return a read-only [pixel, Ebin] view instead of a tiled copy
+    Wvec = np.broadcast_to(Wvec, (cfg.det.totalNumCells, Wvec.size))
     
     return Wvec
     
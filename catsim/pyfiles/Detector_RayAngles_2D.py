@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 from catsim.pyfiles.CommonTools import *
 
 def Detector_RayAngles_2D(cfg):
@@ -28,9 +27,9 @@ def Detector_RayAngles_2D(cfg):
         startInd = det.startIndices[m]
         nCells = det.nCells
 
-        xyzDet = nm.repmat(det.modCoords[m, :], nCells, 1) + \
+        xyzDet = np.tile(det.modCoords[m, :], (nCells, 1)) + \
             det.cellCoords @ (np.c_[det.uvecs[m, :], det.vvecs[m, :]].T)
-        xyzR = xyzDet - nm.repmat(xyzSrc, nCells, 1);
+        xyzR = xyzDet - np.tile(xyzSrc, (nCells, 1));
 
         cellInd = range(startInd, startInd+nCells)
         rayDistance[cellInd] = vectornorm(xyzR.T)
@@ -39,7 +38,7 @@ def Detector_RayAngles_2D(cfg):
         tanAlphas[cellInd] = make_col(xyzR[:, 2]/np.sqrt(np.square(xyzR[:, 0])+np.square(xyzR[:, 1])))
         
         wvec = np.cross(det.uvecs[m, :], det.vvecs[m, :])        
-        xyzR = xyzR/nm.repmat(vectornorm(xyzR.T), 1, 3)
+        xyzR = xyzR/np.tile(vectornorm(xyzR.T), (1, 3))
         betasTmp = np.arccos(np.minimum(xyzR @ wvec, 1))
         
         isLeftMod = xyzR[:, 0]<wvec[0] # betas of the left mod are opposite to the right mod
@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 import math
 from catsim.pyfiles.CommonTools import *
 
@@ -25,8 +24,8 @@ def Detector_ThirdgenCurved(cfg):
     # cell coords
     cols = (np.arange(0, nCol)-(nCol-1)/2)*colSize
     rows = (np.arange(0, nRow)-(nRow-1)/2)*rowSize
-    cols = nm.repmat(cols, nRow, 1).T.reshape(nCol*nRow, 1)
-    rows = nm.repmat(rows, 1, nCol).T
+    cols = np.tile(cols, (nRow, 1)).T.reshape(nCol*nRow, 1)
+    rows = np.tile(rows, (1, nCol)).T
     cellCoords = np.c_[cols, rows]
     
     # sample U coords
@@ -41,8 +40,8 @@ def Detector_ThirdgenCurved(cfg):
     
     # sample coords
     nSamples = nu*nv
-    us = nm.repmat(us, nv, 1).T.reshape(nSamples, 1)
-    vs = nm.repmat(vs, 1, nu).T
+    us = np.tile(us, (nv, 1)).T.reshape(nSamples, 1)
+    vs = np.tile(vs, (1, nu)).T
     sampleCoords = np.c_[us, vs]
     weights = np.ones((nu, nv))/nSamples
     
@@ -57,7 +56,7 @@ def Detector_ThirdgenCurved(cfg):
     # module coords, uvecs, vvecs
     sinA = np.sin(alphas)
     cosA = np.cos(alphas)
-    modCoords = np.c_[sdd*sinA, sid-sdd*cosA, nm.repmat(vOffset, nMod, 1)]
+    modCoords = np.c_[sdd*sinA, sid-sdd*cosA, np.tile(vOffset, (nMod, 1))]
     uvecs = np.c_[cosA, sinA, np.zeros((nMod, 1))]
     vvecs = np.c_[(np.zeros((nMod, 1)), np.zeros((nMod, 1)), np.ones((nMod, 1)))]
     startIndices = np.arange(0, nMod)*nRow*nCol
@@ -1,60 +1,238 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-from ctypes import *
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import POINTER, c_char, c_char_p, c_float, c_int
+import numpy as np
+from numpy.ctypeslib import ndpointer
 from catsim.pyfiles.ReadMaterialFile import ReadMaterialFile
-from catsim.pyfiles.CommonTools import *
+from catsim.pyfiles.CommonTools import my_path, load_C_lib
 
-def GetMu(materialFile, Evec):
+#----------------- load C lib and bind the cross-section function signatures once
+_CLIB = load_C_lib()
+_CLIB.InitializeCrossSectionDB.argtypes = [POINTER(c_char), c_int] # here c_char_p = POINTER(c_char)
+_CLIB.InitializeCrossSectionDB.restype = None
+# energies and the MAC output are passed as float32 numpy arrays directly (as in randpf)
+_CLIB.GetCrossSectionMAC.argtypes = [c_int, POINTER(c_int), POINTER(c_float), c_int,
+                                     ndpointer(c_float, flags='C_CONTIGUOUS'), ndpointer(c_float, flags='C_CONTIGUOUS')]
+_CLIB.GetCrossSectionMAC.restype = None
+# InitializeCrossSectionDB's pair production flag
+_PAIR_PROD_FLAG = 0
 
-    #----------------- load dll lib and material data path
-    clib = load_C_lib()
+#----------------- module-level caches: cross-section DB state and per-material data
+_DB_INITED = False
+_DB_LOCK = threading.Lock()
+_MAT_CACHE = {}
+# in-memory mu, least recently used first; a plain dict rather than functools.lru_cache so hits can be checked
+# without computing misses
+_MU_CACHE = OrderedDict()
+_MU_CACHE_SIZE = 64
+_MU_LOCK = threading.Lock()
 
-    #----------------- initialize cross-section data
-    # the format of this path is finicky and using os.path.join, os.pathsep or changing all \\ to /
-    # does not seem to work on the C code side
-    MaterialDirectory = my_path.paths["material"] + "/"
+# on-disk mu tables, keyed by the cross-section DB fingerprint, material file content and energies
+# off by default; enable with the CATSIM_MU_CACHE_DIR environment variable or by setting
+# catsim.pyfiles.GetMu.MU_CACHE_DIR to a directory before the first GetMu call
+MU_CACHE_DIR = os.environ.get("CATSIM_MU_CACHE_DIR") or None
+_DB_FINGERPRINT = None
 
-    c_MaterialDirectory = c_char_p(bytes(MaterialDirectory, 'utf-8'))
-    # b_MaterialDirectory = b"./data/materials/" # bytes, python3
+def _get_clib():
+    # initialize the cross-section DB on first use only; locked since GetMuBatch calls in from threads
+    global _DB_INITED
+    with _DB_LOCK:
+        if not _DB_INITED:
+            # the format of this path is finicky and using os.path.join, os.pathsep or changing all \\ to /
+            # does not seem to work on the C code side
+            MaterialDirectory = my_path.paths["material"] + "/"
 
-    clib.InitializeCrossSectionDB.argtypes = [POINTER(c_char), c_int] # here c_char_p = POINTER(c_char)
-    clib.InitializeCrossSectionDB.restype = None
+            c_MaterialDirectory = c_char_p(bytes(MaterialDirectory, 'utf-8'))
+            # b_MaterialDirectory = b"./data/materials/" # bytes, python3
 
-    # clib.InitializeCrossSectionDB(MaterialDirectory, 0) # not working
-    clib.InitializeCrossSectionDB(c_MaterialDirectory, 0) # works
-    # clib.InitializeCrossSectionDB(b_MaterialDirectory, 0) # works
+            # _CLIB.InitializeCrossSectionDB(MaterialDirectory, 0) # not working
+            _CLIB.InitializeCrossSectionDB(c_MaterialDirectory, _PAIR_PROD_FLAG) # works
+            # _CLIB.InitializeCrossSectionDB(b_MaterialDirectory, 0) # works
+            _DB_INITED = True
+
+    return _CLIB
+
+def _get_material(materialFile):
+    # read material file once per resolved path, return (numberOfElements, density, atomicNumbers, massFractions)
+    # atomicNumbers/massFractions are packed into ctypes arrays here, once; the C code only reads them,
+    # so the cached buffers are shared as-is between calls and threads
+    materialFile = my_path.find("material", materialFile, '')
+    material = _MAT_CACHE.get(materialFile)
+    if material is None:
+        (numberOfElements, density, atomicNumbers, massFractions) = ReadMaterialFile(materialFile)
+        atomicNumbers = (c_int*numberOfElements)(*atomicNumbers)
+        massFractions = (c_float*numberOfElements)(*massFractions)
+        # setdefault: if two threads parse the same file, both end up using the first stored entry
+        material = _MAT_CACHE.setdefault(materialFile, (numberOfElements, density, atomicNumbers, massFractions))
+    return material
+
+def _db_fingerprint():
+    # hash of everything mu depends on besides the material file: catsim version, cross-section DB
+    # directory and files, pair production flag and the C lib; computed once per process
+    global _DB_FINGERPRINT
+    with _DB_LOCK:
+        if _DB_FINGERPRINT is None:
+            import catsim
+            h = hashlib.blake2b(digest_size=8)
+            MaterialDirectory = my_path.paths["material"]
+            h.update(bytes("%s|%s|%d|" % (catsim.__version__, MaterialDirectory, _PAIR_PROD_FLAG), 'utf-8'))
+            dbDirectory = os.path.join(MaterialDirectory, "edlp")
+            for root, dirs, files in os.walk(dbDirectory):
+                dirs.sort()
+                for fileName in sorted(files):
+                    fileName = os.path.join(root, fileName)
+                    h.update(bytes(os.path.relpath(fileName, dbDirectory), 'utf-8'))
+                    with open(fileName, 'rb') as f:
+                        h.update(f.read())
+            with open(_CLIB._name, 'rb') as f:
+                h.update(f.read())
+            _DB_FINGERPRINT = h.hexdigest()
+    return _DB_FINGERPRINT
+
+def _mu_cache_file(materialFile, energyBytes):
+    # disk cache file name, the hash covers the material file content so edits invalidate it
+    # tables live in a subdirectory per DB fingerprint, so an upgraded DB or C lib never reads old tables
+    with open(materialFile, 'rb') as f:
+        key = hashlib.blake2b(f.read() + energyBytes, digest_size=8).hexdigest()
+    return os.path.join(MU_CACHE_DIR, _db_fingerprint(), "%s_%s.npy" % (os.path.basename(materialFile), key))
+
+def _compute_mu(materialFile, energyBytes):
+    # mu of a (resolved) material file on the float32 energies packed in energyBytes, from the C lib
+
+    #----------------- load dll lib and initialize cross-section data
+    clib = _get_clib()
 
     #----------------- read material file
+    (numberOfElements, density, atomicNumbers, massFractions) = _get_material(materialFile)
+
+    #----------------- GetMAC
+    energies = np.frombuffer(energyBytes, dtype=np.single)
+    numberOfEnergies = energies.size
+    MAC = np.empty(numberOfEnergies, dtype=np.single)
+    clib.GetCrossSectionMAC(numberOfElements, atomicNumbers, massFractions, numberOfEnergies, energies, MAC)
+
+    # scale in place, staying in float32
+    mu = MAC
+    mu *= np.single(density)
+    return mu
+
+def _peek_mu(materialFile, energyBytes):
+    # in-memory cached mu of a (resolved) material file, or None if it isn't cached
+    key = (materialFile, energyBytes)
+    with _MU_LOCK:
+        mu = _MU_CACHE.get(key)
+        if mu is not None:
+            _MU_CACHE.move_to_end(key)
+    return mu
+
+def _get_mu_cached(materialFile, energyBytes):
+    # mu of a (resolved) material file on the float32 energies packed in energyBytes
+    # the returned 1-D float32 array is shared between callers, so it is read-only
+    mu = _peek_mu(materialFile, energyBytes)
+    if mu is None:
+        mu = _load_mu(materialFile, energyBytes)
+        with _MU_LOCK:
+            # setdefault: if two threads compute the same mu, both end up using the first stored one
+            mu = _MU_CACHE.setdefault((materialFile, energyBytes), mu)
+            if len(_MU_CACHE) > _MU_CACHE_SIZE:
+                _MU_CACHE.popitem(last=False)
+    return mu
+
+def _load_mu(materialFile, energyBytes):
+    # read-only mu from the on-disk table if enabled, otherwise from the C lib
+    if not MU_CACHE_DIR:
+        mu = _compute_mu(materialFile, energyBytes)
+        mu.flags.writeable = False
+        return mu
+
+    #----------------- on-disk table, skips the cross-section DB entirely on a hit
+    cacheFile = _mu_cache_file(materialFile, energyBytes)
+    if os.path.isfile(cacheFile):
+        return np.load(cacheFile, mmap_mode='r').view(np.ndarray)
+
+    mu = _compute_mu(materialFile, energyBytes)
+    mu.flags.writeable = False
+    try:
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+        # write to a per-process/thread temp file and rename, so concurrent runs never see a partial table
+        tmpFile = "%s.%d.%d.tmp" % (cacheFile, os.getpid(), threading.get_ident())
+        with open(tmpFile, 'wb') as f:
+            np.save(f, mu)
+        os.replace(tmpFile, cacheFile)
+    except OSError as err:
+        print(f"***WARNING: Unable to write mu cache file {cacheFile}: {err}")
+    return mu
+
+def GetMu(materialFile, Evec, out=None):
+    # out (optional): preallocated float32 array with one element per energy; mu is written into it and returned
+
     materialFile = my_path.find("material", materialFile, '')
-    (numberOfElements, density, atomicNumbers, massFractions) = ReadMaterialFile(materialFile)
-    atomicNumbers = (c_int*numberOfElements)(*atomicNumbers)
-    massFractions = (c_float*numberOfElements)(*massFractions)
+
+    #----------------- single energy: pack the float32 key directly, no array round trip
+    if isinstance(Evec, (int, float)) and out is None:
+        return _get_mu_cached(materialFile, np.single(Evec).tobytes()).tolist()
 
     #----------------- X-ray energy vector
     isNumpy = isinstance(Evec, np.ndarray)
     if isNumpy:
         origShape = Evec.shape
-        Evec = list(Evec.ravel())
-    elif isinstance(Evec, (int, float)):
-        Evec = [Evec]
-    numberOfEnergies = len(Evec)
-    energies = (c_float*numberOfEnergies)(*Evec)
-        
-    #----------------- GetMAC
-    MAC = (c_float*numberOfEnergies)()
-    clib.GetCrossSectionMAC.argtypes = [c_int, POINTER(c_int), POINTER(c_float), c_int, POINTER(c_float), POINTER(c_float)]
-    clib.GetCrossSectionMAC.restype = None
-    clib.GetCrossSectionMAC(numberOfElements, atomicNumbers, massFractions, numberOfEnergies, energies, MAC)
-    
-    mu = []
-    for ii in range(0, numberOfEnergies):
-        mu.append(MAC[ii]*density)
+    energies = np.ascontiguousarray(Evec, dtype=np.single).ravel()
 
-    if isNumpy:
-        mu = np.array(mu,dtype=np.single)
-        mu = mu.reshape(origShape)
+    #----------------- mu, cached per material file and energy vector
+    mu = _get_mu_cached(materialFile, energies.tobytes())
+    if out is not None:
+        if not isinstance(out, np.ndarray) or out.dtype != np.single or out.size != mu.size:
+            raise Exception("GetMu: out must be a float32 array with %d elements" % (mu.size))
+        np.copyto(out, mu.reshape(out.shape))
+        mu = out
+    elif isNumpy:
+        mu = mu.reshape(origShape).copy()
+    else:
+        mu = mu.tolist()
     return mu
 
+def _cache_clear():
+    # drop all cached mu and material data, e.g. after a material file was edited
+    with _MU_LOCK:
+        _MU_CACHE.clear()
+    _MAT_CACHE.clear()
+
+GetMu.cache_clear = _cache_clear
+
+def GetMuBatch(materialFiles, Evec):
+    # mu of several materials on one energy grid, returned as a float32 array [material, Ebin]
+
+    #----------------- X-ray energy vector, converted once for all materials
+    energies = np.ascontiguousarray(Evec, dtype=np.single).ravel()
+    energyBytes = energies.tobytes()
+
+    #----------------- mu of each material, one row each
+    # materials are independent and ctypes releases the GIL during the C call, so they run in threads
+    materialFiles = [my_path.find("material", materialFile, '') for materialFile in materialFiles]
+    mus = np.empty((len(materialFiles), energies.size), dtype=np.single)
+    # rows already cached in memory are filled directly; only the misses are computed
+    missing = []
+    for ii, materialFile in enumerate(materialFiles):
+        mu = _peek_mu(materialFile, energyBytes)
+        if mu is None:
+            missing.append(ii)
+        else:
+            mus[ii] = mu
+    # threads only pay off when there is more than one miss
+    if len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(missing), os.cpu_count() or 1)) as executor:
+            rows = executor.map(lambda ii: _get_mu_cached(materialFiles[ii], energyBytes), missing)
+            for ii, mu in zip(missing, rows):
+                mus[ii] = mu
+    elif missing:
+        mus[missing[0]] = _get_mu_cached(materialFiles[missing[0]], energyBytes)
+    return mus
+
 if __name__ == '__main__':
     Evec = range(10, 70, 10)
     # Evec = np.array([(20, 30, 40), (50, 60, 70)], dtype=np.single)
@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 from catsim.pyfiles.CommonTools import *
 
 def prep_view(cfg):
@@ -18,9 +17,9 @@ def prep_view(cfg):
     
     ###--------- log
     if cfg.protocol.airViewCount==1:
-        airscan = nm.repmat(airscan, cfg.protocol.viewCount, 1)
+        airscan = np.tile(airscan, (cfg.protocol.viewCount, 1))
     if cfg.protocol.offsetViewCount==1:
-        offsetScan = nm.repmat(offsetScan, cfg.protocol.viewCount, 1)
+        offsetScan = np.tile(offsetScan, (cfg.protocol.viewCount, 1))
     prep = (phantomScan-offsetScan)/(airscan-offsetScan)
     smallValue = 1e-12
     prep[prep<smallValue] = smallValue
@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 import math
 from catsim.pyfiles.CommonTools import *
 
@@ -22,21 +21,21 @@ def Source_Uniform(cfg):
     
     # sample coords and weights
     nSamples = nx*ny
-    weights = nm.repmat(1/nSamples, 1, nSamples)
+    weights = np.tile(1/nSamples, (1, nSamples))
     
     x = (np.arange(0, nx)-(nx-1)/2)*dx
     y = (np.arange(0, ny)-(ny-1)/2)*dy+cfg.scanner.sid
     z = (np.arange(0, nz)-(nz-1)/2)*dz
     
-    x = nm.repmat(x, 1, ny).T
-    y = nm.repmat(y, nx, 1).T.reshape(nSamples, 1)
-    z = nm.repmat(z, nx, 1).T.reshape(nSamples, 1)
+    x = np.tile(x, (1, ny)).T
+    y = np.tile(y, (nx, 1)).T.reshape(nSamples, 1)
+    z = np.tile(z, (nx, 1)).T.reshape(nSamples, 1)
     
     samples = np.c_[x, y, z]
     
     # focal spot offset
     if cfg.protocol.focalspotOffset:
-        samples = samples + nm.repmat(cfg.protocol.focalspotOffset, nSamples, 1)
+        samples = samples + np.tile(cfg.protocol.focalspotOffset, (nSamples, 1))
     
     # corners
     if nx==1 and ny==1:
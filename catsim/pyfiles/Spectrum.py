@@ -1,6 +1,5 @@
 # Copyright 2020, General Electric Company. All rights reserved. See https://github.com/xcist/code/blob/master/LICENSE
 
-import numpy.matlib as nm
 from catsim.pyfiles.CommonTools import *
 
 def Spectrum(cfg):
@@ -58,7 +57,7 @@ def Spectrum(cfg):
     Ivec1 = Ivec1.astype(np.float32)
     
     # repeat to all pixels
-    Ivec1 = nm.repmat(Ivec1, cfg.det.totalNumCells, 1)
+    Ivec1 = np.tile(Ivec1, (cfg.det.totalNumCells, 1))
 
     cfg.spec.nEbin = nEbin
     cfg.spec.Evec = Evec1
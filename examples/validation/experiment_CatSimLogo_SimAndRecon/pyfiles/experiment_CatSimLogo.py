@@ -28,7 +28,7 @@
 # 08. Phantom offset simulation evaluation (5 simulations/reconstructions)
 # 09. Reconstruction offset evaluation (1 simulation and 3 reconstructions)
 #
-# Each sim/recon is independent except experiments 02 and 09, which use the same sim for multiple recons.
+# Each sim/recon is independent except experiments 02, 07 and 09, which use the same sim for multiple recons.
 # Each sim/recon is included in a list of sim/recons to run - see "##--------- Define experiment names".
 # Each can be run or not by uncommenting or commenting them.
 #
@@ -44,431 +44,557 @@
 
 import os
 import copy
+import enum
+import functools
+import pickle
 import shutil
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+import matplotlib.pyplot as plt
 import catsim as xc
 import reconstruction.pyfiles.recon as recon
 
-def setExperimentParameters(cfg):
-
-    experimentName = cfg.experimentName
-
+# Integer IDs for all the experiments. The tables below are looked up by ID rather than by the (long) experiment name.
+ExperimentID = enum.IntEnum("ExperimentID", [
+    "01_01_Baseline",
+    "01_02_Physics_eNoiseOn",
+    "01_03_Physics_qNoiseOn",
+    "01_04_Physics_NoiseOn",
+    "01_05_Physics_1ebin",
+    "01_06_Physics_eNoiseOn_1ebin",
+    "01_07_Physics_qNoiseOn_1ebin",
+    "01_08_Physics_NoiseOn_1ebin",
+    "01_09_Physics_Monoenergetic",
+    "01_10_Physics_eNoiseOn_Monoenergetic",
+    "01_11_Physics_qNoiseOn_Monoenergetic",
+    "01_12_Physics_NoiseOn_Monoenergetic",
+    "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
+    "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
+    "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
+    "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
+    "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel",
+    "03_01_Physics_NoiseOn_Protocol_0p5rotation",
+    "03_02_Physics_NoiseOn_Protocol_1p0rotation",
+    "03_03_Physics_NoiseOn_Protocol_2p0rotation",
+    "04_01_Physics_NoiseOn_Protocol_100views",
+    "04_02_Physics_NoiseOn_Protocol_360views",
+    "04_03_Physics_NoiseOn_Protocol_1000views",
+    "05_01_Physics_SourceSampling1_Recon_128mmFOV",
+    "05_02_Physics_SourceSampling2_Recon_128mmFOV",
+    "05_03_Physics_SourceSampling3_Recon_128mmFOV",
+    "05_04_Physics_DetectorSampling1_Recon_128mmFOV",
+    "05_05_Physics_DetectorSampling2_Recon_128mmFOV",
+    "05_06_Physics_DetectorSampling3_Recon_128mmFOV",
+    "05_07_Physics_ViewSampling1_Recon_300mmFOV",
+    "05_08_Physics_ViewSampling2_Recon_300mmFOV",
+    "05_09_Physics_ViewSampling3_Recon_300mmFOV",
+    "06_00_Scanner_64rows_Physics_NoScatter",
+    "06_01_Scanner_64rows_Physics_ScatterScale1",
+    "06_02_Scanner_64rows_Physics_ScatterScale8",
+    "06_03_Scanner_64rows_Physics_ScatterScale64",
+    "07_01_Scanner_16rows_Recon_1slice",
+    "07_02_Scanner_16rows_Recon_2slices",
+    "07_03_Scanner_16rows_Recon_16slices",
+    "08_01_Scanner_16rows_Phantom_offset0",
+    "08_02_Scanner_16rows_Phantom_offset+50mmX",
+    "08_03_Scanner_16rows_Phantom_offset+50mmY",
+    "08_04_Scanner_16rows_Phantom_offset+4mmZ",
+    "08_05_Scanner_16rows_Phantom_offset+8mmZ",
+    "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+    "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+    "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+    "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ",
+], start=0)
+
+
+def experimentIDs(experimentNames):
+    # Convert a set of experiment names to a set of experiment IDs.
+
+    return frozenset(ExperimentID[experimentName] for experimentName in experimentNames)
+
+
+# Parameters shared by groups of experiments. Each entry is (set of experiment IDs, {"cfg.path": value}),
+# and the entries are applied in this order.
+experimentGroupParameters = [
     # Some experiments use 1000 views and low mA.
-    if experimentName == "01_01_Baseline"                        \
-    or experimentName == "01_02_Physics_eNoiseOn"                \
-    or experimentName == "01_03_Physics_qNoiseOn"                \
-    or experimentName == "01_04_Physics_NoiseOn"                 \
-    or experimentName == "01_05_Physics_1ebin"                   \
-    or experimentName == "01_06_Physics_eNoiseOn_1ebin"          \
-    or experimentName == "01_07_Physics_qNoiseOn_1ebin"          \
-    or experimentName == "01_08_Physics_NoiseOn_1ebin"           \
-    or experimentName == "01_09_Physics_Monoenergetic"           \
-    or experimentName == "01_10_Physics_eNoiseOn_Monoenergetic"  \
-    or experimentName == "01_11_Physics_qNoiseOn_Monoenergetic"  \
-    or experimentName == "01_12_Physics_NoiseOn_Monoenergetic":
-        cfg.protocol.mA = 100
-    
+    (experimentIDs({"01_01_Baseline",
+                    "01_02_Physics_eNoiseOn",
+                    "01_03_Physics_qNoiseOn",
+                    "01_04_Physics_NoiseOn",
+                    "01_05_Physics_1ebin",
+                    "01_06_Physics_eNoiseOn_1ebin",
+                    "01_07_Physics_qNoiseOn_1ebin",
+                    "01_08_Physics_NoiseOn_1ebin",
+                    "01_09_Physics_Monoenergetic",
+                    "01_10_Physics_eNoiseOn_Monoenergetic",
+                    "01_11_Physics_qNoiseOn_Monoenergetic",
+                    "01_12_Physics_NoiseOn_Monoenergetic"}),
+        {"protocol.mA": 100}),
+
     # Some experiments use a 128mm FOV.
-    if experimentName == "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel"                    \
-    or experimentName == "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel"                    \
-    or experimentName == "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel"                   \
-    or experimentName == "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel"               \
-    or experimentName == "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel"                   \
-    or experimentName == "05_01_Physics_SourceSampling1_Recon_128mmFOV"                      \
-    or experimentName == "05_02_Physics_SourceSampling2_Recon_128mmFOV"                      \
-    or experimentName == "05_03_Physics_SourceSampling3_Recon_128mmFOV"                      \
-    or experimentName == "05_04_Physics_DetectorSampling1_Recon_128mmFOV"                    \
-    or experimentName == "05_05_Physics_DetectorSampling2_Recon_128mmFOV"                    \
-    or experimentName == "05_06_Physics_DetectorSampling3_Recon_128mmFOV":
-        cfg.recon.fov = 128.0
+    (experimentIDs({"02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
+                    "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
+                    "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
+                    "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
+                    "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel",
+                    "05_01_Physics_SourceSampling1_Recon_128mmFOV",
+                    "05_02_Physics_SourceSampling2_Recon_128mmFOV",
+                    "05_03_Physics_SourceSampling3_Recon_128mmFOV",
+                    "05_04_Physics_DetectorSampling1_Recon_128mmFOV",
+                    "05_05_Physics_DetectorSampling2_Recon_128mmFOV",
+                    "05_06_Physics_DetectorSampling3_Recon_128mmFOV"}),
+        {"recon.fov": 128.0}),
 
     # Some experiments use only electronic noise.
-    if experimentName == "01_02_Physics_eNoiseOn"                                             \
-    or experimentName == "01_06_Physics_eNoiseOn_1ebin"                                       \
-    or experimentName == "01_10_Physics_eNoiseOn_Monoenergetic":
-        cfg.physics.enableElectronicNoise = 1
+    (experimentIDs({"01_02_Physics_eNoiseOn",
+                    "01_06_Physics_eNoiseOn_1ebin",
+                    "01_10_Physics_eNoiseOn_Monoenergetic"}),
+        {"physics.enableElectronicNoise": 1}),
 
     # Some experiments use only quantum noise.
-    if experimentName == "01_03_Physics_qNoiseOn"                                             \
-    or experimentName == "01_07_Physics_qNoiseOn_1ebin"                                       \
-    or experimentName == "01_11_Physics_qNoiseOn_Monoenergetic":
-        cfg.physics.enableQuantumNoise = 1
-
-    # Some experiments use electonic and quantum noise and produce unique projection data.
-    if experimentName == "01_04_Physics_NoiseOn"                                             \
-    or experimentName == "01_08_Physics_NoiseOn_1ebin"                                       \
-    or experimentName == "01_12_Physics_NoiseOn_Monoenergetic"                               \
-    or experimentName == "03_01_Physics_NoiseOn_Protocol_0p5rotation"                        \
-    or experimentName == "03_02_Physics_NoiseOn_Protocol_1p0rotation"                        \
-    or experimentName == "03_03_Physics_NoiseOn_Protocol_2p0rotation"                        \
-    or experimentName == "04_01_Physics_NoiseOn_Protocol_100views"                           \
-    or experimentName == "04_02_Physics_NoiseOn_Protocol_360views"                           \
-    or experimentName == "04_03_Physics_NoiseOn_Protocol_1000views":
-        cfg.physics.enableQuantumNoise = 1
-        cfg.physics.enableElectronicNoise = 1
-
-    # Some experiments use electonic and quantum noise and the projection data should be common to several recons.
-    if experimentName == "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel"                    \
-    or experimentName == "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel"                    \
-    or experimentName == "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel"                   \
-    or experimentName == "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel"               \
-    or experimentName == "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel":
-        cfg.physics.enableQuantumNoise = 1
-        cfg.physics.enableElectronicNoise = 1
-
-        # Only do the sim for the first one. Otherwise, copy the relevant projection data.
-        if experimentName == "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel"                    \
-        or experimentName == "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel"                   \
-        or experimentName == "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel"               \
-        or experimentName == "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel":
-            copyFromExperimentName = "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel"
-            cfg.do_Sim = False
-    
-        if not experimentName == "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel":
-            copyFromPathname = os.path.join(experimentDirectory, copyFromExperimentName,  copyFromExperimentName + ".prep")
-            copyToPathname = cfg.resultsName + ".prep"
-            shutil.copy2(copyFromPathname, copyToPathname)
-
-    # Most experiments use the baseline polyenergetic spectrum and number of energy bins,
-    # but a few use different spectra.
-    # We need to adjust the recon mu values for each spectrum to make water = 0 HU.
-    # The adjusted mu values were determined experimentally by first reconstructing with cgf.recon.mu = 0.02,
-    # measuring water HU in a cental ROI (40 pixels wide, 80 pixels high),
-    # and calculating the mu required to make water = 0 HU using this formula:
-    # cfg.recon.mu = 0.02 + HU(water, measured)*0.02/1000
-
-    # Baseline:
-    cfg.recon.mu = 0.019672
+    (experimentIDs({"01_03_Physics_qNoiseOn",
+                    "01_07_Physics_qNoiseOn_1ebin",
+                    "01_11_Physics_qNoiseOn_Monoenergetic"}),
+        {"physics.enableQuantumNoise": 1}),
+
+    # Some experiments use electonic and quantum noise.
+    # For the 02 experiments, the projection data is common to several recons - see simGroups.
+    (experimentIDs({"01_04_Physics_NoiseOn",
+                    "01_08_Physics_NoiseOn_1ebin",
+                    "01_12_Physics_NoiseOn_Monoenergetic",
+                    "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
+                    "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
+                    "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
+                    "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
+                    "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel",
+                    "03_01_Physics_NoiseOn_Protocol_0p5rotation",
+                    "03_02_Physics_NoiseOn_Protocol_1p0rotation",
+                    "03_03_Physics_NoiseOn_Protocol_2p0rotation",
+                    "04_01_Physics_NoiseOn_Protocol_100views",
+                    "04_02_Physics_NoiseOn_Protocol_360views",
+                    "04_03_Physics_NoiseOn_Protocol_1000views"}),
+        {"physics.enableQuantumNoise": 1,
+         "physics.enableElectronicNoise": 1}),
 
     # Some experiments use a polyenergetic spectrum but only one energy bin.
-    if experimentName == "01_05_Physics_1ebin"                                       \
-    or experimentName == "01_06_Physics_eNoiseOn_1ebin"                              \
-    or experimentName == "01_07_Physics_qNoiseOn_1ebin"                              \
-    or experimentName == "01_08_Physics_NoiseOn_1ebin":
-        cfg.physics.energyCount = 1
-        cfg.recon.mu = 0.02061
+    (experimentIDs({"01_05_Physics_1ebin",
+                    "01_06_Physics_eNoiseOn_1ebin",
+                    "01_07_Physics_qNoiseOn_1ebin",
+                    "01_08_Physics_NoiseOn_1ebin"}),
+        {"physics.energyCount": 1,
+         "recon.mu": 0.02061}),
 
     # Some experiments use a monoenergetic spectrum.
-    if experimentName == "01_09_Physics_Monoenergetic"                               \
-    or experimentName == "01_10_Physics_eNoiseOn_Monoenergetic"                      \
-    or experimentName == "01_11_Physics_qNoiseOn_Monoenergetic"                      \
-    or experimentName == "01_12_Physics_NoiseOn_Monoenergetic":
-        cfg.physics.monochromatic = 70
-        cfg.recon.mu = 0.019326
+    (experimentIDs({"01_09_Physics_Monoenergetic",
+                    "01_10_Physics_eNoiseOn_Monoenergetic",
+                    "01_11_Physics_qNoiseOn_Monoenergetic",
+                    "01_12_Physics_NoiseOn_Monoenergetic"}),
+        {"physics.monochromatic": 70,
+         "recon.mu": 0.019326}),
 
+    # Source sampling: sourece needs to be large to see the effect.
+    (experimentIDs({"05_01_Physics_SourceSampling1_Recon_128mmFOV",
+                    "05_02_Physics_SourceSampling2_Recon_128mmFOV",
+                    "05_03_Physics_SourceSampling3_Recon_128mmFOV"}),
+        {"scanner.focalspotWidth": 5.0,
+         "scanner.focalspotLength": 5.0}),
+
+    # The sampling experiments use a wider window.
+    (experimentIDs({"05_01_Physics_SourceSampling1_Recon_128mmFOV",
+                    "05_02_Physics_SourceSampling2_Recon_128mmFOV",
+                    "05_03_Physics_SourceSampling3_Recon_128mmFOV",
+                    "05_04_Physics_DetectorSampling1_Recon_128mmFOV",
+                    "05_05_Physics_DetectorSampling2_Recon_128mmFOV",
+                    "05_06_Physics_DetectorSampling3_Recon_128mmFOV",
+                    "05_07_Physics_ViewSampling1_Recon_300mmFOV",
+                    "05_08_Physics_ViewSampling2_Recon_300mmFOV",
+                    "05_09_Physics_ViewSampling3_Recon_300mmFOV"}),
+        {"displayWindowMin": -100,              # In HU.
+         "displayWindowMax": 1300}),            # In HU.
+
+    # Scatter experiments use a 64-row sim and recon.
+    (experimentIDs({"06_00_Scanner_64rows_Physics_NoScatter",
+                    "06_01_Scanner_64rows_Physics_ScatterScale1",
+                    "06_02_Scanner_64rows_Physics_ScatterScale8",
+                    "06_03_Scanner_64rows_Physics_ScatterScale64"}),
+        {"phantom.filename": 'CatSimLogo_1024_128mmZ.json', # The phantom scale factor is 0.5, resulting in 64-mm Z.
+         "scanner.detectorRowsPerMod": 64,
+         "scanner.detectorRowCount": 64,
+         "recon.sliceCount": 64,
+         "displayWindowMin": -200,              # In HU.
+         "displayWindowMax": 200}),             # In HU.
+
+    (experimentIDs({"06_01_Scanner_64rows_Physics_ScatterScale1",
+                    "06_02_Scanner_64rows_Physics_ScatterScale8",
+                    "06_03_Scanner_64rows_Physics_ScatterScale64"}),
+        {"physics.scatterCallback": "Scatter_ConvolutionModel",
+         "physics.scatterKernelCallback": ""}),
+
+    # Some experiments use a 16-slice sim, and most of those use a 16-slice recon.
+    (experimentIDs({"07_01_Scanner_16rows_Recon_1slice",
+                    "07_02_Scanner_16rows_Recon_2slices",
+                    "07_03_Scanner_16rows_Recon_16slices",
+                    "08_01_Scanner_16rows_Phantom_offset0",
+                    "08_02_Scanner_16rows_Phantom_offset+50mmX",
+                    "08_03_Scanner_16rows_Phantom_offset+50mmY",
+                    "08_04_Scanner_16rows_Phantom_offset+4mmZ",
+                    "08_05_Scanner_16rows_Phantom_offset+8mmZ",
+                    "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+                    "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+                    "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+                    "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"}),
+        {"scanner.detectorRowsPerMod": 16,
+         "scanner.detectorRowCount": 16,
+         "recon.sliceCount": 16}),
+
+    # For phantom and recon offset tests, use 360 views and don't use oversampling.
+    (experimentIDs({"08_01_Scanner_16rows_Phantom_offset0",
+                    "08_02_Scanner_16rows_Phantom_offset+50mmX",
+                    "08_03_Scanner_16rows_Phantom_offset+50mmY",
+                    "08_04_Scanner_16rows_Phantom_offset+4mmZ",
+                    "08_05_Scanner_16rows_Phantom_offset+8mmZ",
+                    "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+                    "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+                    "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+                    "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"}),
+        {"protocol.viewsPerRotation": 360,
+         "physics.srcXSampleCount": 1,
+         "physics.srcYSampleCount": 1,
+         "physics.rowSampleCount": 1,
+         "physics.colSampleCount": 1,
+         "physics.viewSampleCount": 1}),
+
+    # Using a 16-slice sim and recon with 0.5-mm slices, vary the recon X, Y, and Z offset.
+    (experimentIDs({"09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+                    "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+                    "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+                    "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"}),
+        {"recon.sliceThickness": 0.5}),
+]
+
+# Parameters unique to one experiment, applied after the group parameters.
+experimentParameters = {
     # Vary the recon kernel
-    if experimentName == "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel":
-        cfg.recon.kernelType = "R-L"
-    if experimentName == "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel":
-        cfg.recon.kernelType = "S-L"
-    if experimentName == "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel":
-        cfg.recon.kernelType = "Soft"
-    if experimentName == "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel":
-        cfg.recon.kernelType = "Standard"
-    if experimentName == "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel":
-        cfg.recon.kernelType = "Bone"
+    ExperimentID["02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel"]:         {"recon.kernelType": "R-L"},
+    ExperimentID["02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel"]:         {"recon.kernelType": "S-L"},
+    ExperimentID["02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel"]:        {"recon.kernelType": "Soft"},
+    ExperimentID["02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel"]:    {"recon.kernelType": "Standard"},
+    ExperimentID["02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel"]:        {"recon.kernelType": "Bone"},
 
     # Vary the rotation time.
-    if experimentName == "03_01_Physics_NoiseOn_Protocol_0p5rotation":
-        cfg.protocol.rotationTime = 0.5
-    if experimentName == "03_02_Physics_NoiseOn_Protocol_1p0rotation":
-        cfg.protocol.rotationTime = 1.0
-    if experimentName == "03_03_Physics_NoiseOn_Protocol_2p0rotation":
-        cfg.protocol.rotationTime = 2.0
+    ExperimentID["03_01_Physics_NoiseOn_Protocol_0p5rotation"]:             {"protocol.rotationTime": 0.5},
+    ExperimentID["03_02_Physics_NoiseOn_Protocol_1p0rotation"]:             {"protocol.rotationTime": 1.0},
+    ExperimentID["03_03_Physics_NoiseOn_Protocol_2p0rotation"]:             {"protocol.rotationTime": 2.0},
 
     # Vary the number of views.
-    if experimentName == "04_01_Physics_NoiseOn_Protocol_100views":
-        cfg.protocol.viewsPerRotation = 100
-    if experimentName == "04_02_Physics_NoiseOn_Protocol_360views":
-        cfg.protocol.viewsPerRotation = 360
-    if experimentName == "04_03_Physics_NoiseOn_Protocol_1000views":
-        cfg.protocol.viewsPerRotation = 1000
-    cfg.protocol.viewCount = cfg.protocol.viewsPerRotation
-    cfg.protocol.stopViewId = cfg.protocol.viewCount - 1
+    ExperimentID["04_01_Physics_NoiseOn_Protocol_100views"]:                {"protocol.viewsPerRotation": 100},
+    ExperimentID["04_02_Physics_NoiseOn_Protocol_360views"]:                {"protocol.viewsPerRotation": 360},
+    ExperimentID["04_03_Physics_NoiseOn_Protocol_1000views"]:               {"protocol.viewsPerRotation": 1000},
 
     # Vary the in-plane sampling.
-    # Source sampling: sourece needs to be large to see the effect.
-    if experimentName == "05_01_Physics_SourceSampling1_Recon_128mmFOV" \
-    or experimentName == "05_02_Physics_SourceSampling2_Recon_128mmFOV" \
-    or experimentName == "05_03_Physics_SourceSampling3_Recon_128mmFOV":
-        cfg.scanner.focalspotWidth = 5.0
-        cfg.scanner.focalspotLength = 5.0
-    if experimentName == "05_01_Physics_SourceSampling1_Recon_128mmFOV":
-        cfg.physics.srcXSampleCount = 1
-    if experimentName == "05_02_Physics_SourceSampling2_Recon_128mmFOV":
-        cfg.physics.srcXSampleCount = 2
-    if experimentName == "05_03_Physics_SourceSampling3_Recon_128mmFOV":
-        cfg.physics.srcXSampleCount = 3
-
+    ExperimentID["05_01_Physics_SourceSampling1_Recon_128mmFOV"]:           {"physics.srcXSampleCount": 1},
+    ExperimentID["05_02_Physics_SourceSampling2_Recon_128mmFOV"]:           {"physics.srcXSampleCount": 2},
+    ExperimentID["05_03_Physics_SourceSampling3_Recon_128mmFOV"]:           {"physics.srcXSampleCount": 3},
     # Detector sampling: expect no effect with voxelized phantoms.
-    if experimentName == "05_04_Physics_DetectorSampling1_Recon_128mmFOV":
-        cfg.physics.colSampleCount = 1
-    if experimentName == "05_05_Physics_DetectorSampling2_Recon_128mmFOV":
-        cfg.physics.colSampleCount = 2
-    if experimentName == "05_06_Physics_DetectorSampling3_Recon_128mmFOV":
-        cfg.physics.colSampleCount = 3
-
+    ExperimentID["05_04_Physics_DetectorSampling1_Recon_128mmFOV"]:         {"physics.colSampleCount": 1},
+    ExperimentID["05_05_Physics_DetectorSampling2_Recon_128mmFOV"]:         {"physics.colSampleCount": 2},
+    ExperimentID["05_06_Physics_DetectorSampling3_Recon_128mmFOV"]:         {"physics.colSampleCount": 3},
     # View sampling: need to zoom in on a radial edge at the edge of the FOV to see the effect.
-    if experimentName == "05_07_Physics_ViewSampling1_Recon_300mmFOV":
-        cfg.physics.viewSampleCount = 1
-    if experimentName == "05_08_Physics_ViewSampling2_Recon_300mmFOV":
-        cfg.physics.viewSampleCount = 2
-    if experimentName == "05_09_Physics_ViewSampling3_Recon_300mmFOV":
-        cfg.physics.viewSampleCount = 3
-
-    if experimentName == "05_01_Physics_SourceSampling1_Recon_128mmFOV"    \
-    or experimentName == "05_02_Physics_SourceSampling2_Recon_128mmFOV"    \
-    or experimentName == "05_03_Physics_SourceSampling3_Recon_128mmFOV"    \
-    or experimentName == "05_04_Physics_DetectorSampling1_Recon_128mmFOV"  \
-    or experimentName == "05_05_Physics_DetectorSampling2_Recon_128mmFOV"  \
-    or experimentName == "05_06_Physics_DetectorSampling3_Recon_128mmFOV"  \
-    or experimentName == "05_07_Physics_ViewSampling1_Recon_300mmFOV"      \
-    or experimentName == "05_08_Physics_ViewSampling2_Recon_300mmFOV"      \
-    or experimentName == "05_09_Physics_ViewSampling3_Recon_300mmFOV":
-        cfg.displayWindowMin = -100             # In HU.
-        cfg.displayWindowMax = 1300             # In HU.
+    ExperimentID["05_07_Physics_ViewSampling1_Recon_300mmFOV"]:             {"physics.viewSampleCount": 1},
+    ExperimentID["05_08_Physics_ViewSampling2_Recon_300mmFOV"]:             {"physics.viewSampleCount": 2},
+    ExperimentID["05_09_Physics_ViewSampling3_Recon_300mmFOV"]:             {"physics.viewSampleCount": 3},
 
     # Vary scatter
-    if experimentName == "06_00_Scanner_64rows_Physics_NoScatter"      \
-    or experimentName == "06_01_Scanner_64rows_Physics_ScatterScale1"  \
-    or experimentName == "06_02_Scanner_64rows_Physics_ScatterScale8"  \
-    or experimentName == "06_03_Scanner_64rows_Physics_ScatterScale64":
-        cfg.phantom.filename = 'CatSimLogo_1024_128mmZ.json' # The phantom scale factor is 0.5, resulting in 64-mm Z.
-        cfg.scanner.detectorRowsPerMod = 64
-        cfg.scanner.detectorRowCount = cfg.scanner.detectorRowsPerMod
-        cfg.recon.sliceCount = 64
-        cfg.displayWindowMin = -200             # In HU.
-        cfg.displayWindowMax = 200              # In HU.
-
-    if experimentName == "06_01_Scanner_64rows_Physics_ScatterScale1"  \
-    or experimentName == "06_02_Scanner_64rows_Physics_ScatterScale8"  \
-    or experimentName == "06_03_Scanner_64rows_Physics_ScatterScale64":
-        cfg.physics.scatterCallback = "Scatter_ConvolutionModel"
-        cfg.physics.scatterKernelCallback = ""
-    if experimentName == "06_01_Scanner_64rows_Physics_ScatterScale1":
-        cfg.physics.scatterScaleFactor = 1
-    if experimentName == "06_02_Scanner_64rows_Physics_ScatterScale8":
-        cfg.physics.scatterScaleFactor = 8
-    if experimentName == "06_03_Scanner_64rows_Physics_ScatterScale64":
-        cfg.physics.scatterScaleFactor = 64
-    
-    # Some experiments use a 16-slice sim, and most of those use a 16-slice recon.
-    if experimentName == "07_01_Scanner_16rows_Recon_1slice"                     \
-    or experimentName == "07_02_Scanner_16rows_Recon_2slices"                    \
-    or experimentName == "07_03_Scanner_16rows_Recon_16slices"                   \
-    or experimentName == "08_01_Scanner_16rows_Phantom_offset0"                  \
-    or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX"             \
-    or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY"             \
-    or experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ"              \
-    or experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ"              \
-    or experimentName == "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0"        \
-    or experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX"   \
-    or experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY"   \
-    or experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ":
-        cfg.scanner.detectorRowsPerMod = 16
-        cfg.scanner.detectorRowCount = cfg.scanner.detectorRowsPerMod
-        cfg.recon.sliceCount = 16
-    # But some of them vary the number of recon slices. These only require one simulation.
-    if experimentName == "07_01_Scanner_16rows_Recon_1slice":
-        cfg.recon.sliceCount = 1
-    if experimentName == "07_02_Scanner_16rows_Recon_2slices":
-        cfg.recon.sliceCount = 2
-    if experimentName == "07_03_Scanner_16rows_Recon_16slices":
-        cfg.recon.sliceCount = 16
-
-    if experimentName == "07_02_Scanner_16rows_Recon_2slices" \
-    or experimentName == "07_03_Scanner_16rows_Recon_16slices":
-        cfg.do_Sim = False
-        copyFromExperimentName = "07_01_Scanner_16rows_Recon_1slice"
-        copyFromPathname = os.path.join(experimentDirectory,  copyFromExperimentName,  copyFromExperimentName + ".prep")
-        copyToPathname = cfg.resultsName + ".prep"
-        shutil.copy2(copyFromPathname, copyToPathname)
+    ExperimentID["06_01_Scanner_64rows_Physics_ScatterScale1"]:             {"physics.scatterScaleFactor": 1},
+    ExperimentID["06_02_Scanner_64rows_Physics_ScatterScale8"]:             {"physics.scatterScaleFactor": 8},
+    ExperimentID["06_03_Scanner_64rows_Physics_ScatterScale64"]:            {"physics.scatterScaleFactor": 64},
+
+    # Vary the number of recon slices. These only require one simulation.
+    ExperimentID["07_01_Scanner_16rows_Recon_1slice"]:                      {"recon.sliceCount": 1},
+    ExperimentID["07_02_Scanner_16rows_Recon_2slices"]:                     {"recon.sliceCount": 2},
+    ExperimentID["07_03_Scanner_16rows_Recon_16slices"]:                    {"recon.sliceCount": 16},
 
-    # For phantom and recon offset tests, use 360 views and don't use oversampling.
-    if experimentName == "08_01_Scanner_16rows_Phantom_offset0"               \
-    or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX"          \
-    or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY"          \
-    or experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ"           \
-    or experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ"           \
-    or experimentName == "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0"        \
-    or experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX"   \
-    or experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY"   \
-    or experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ":
-        cfg.protocol.viewsPerRotation = 360
-        cfg.protocol.viewCount = cfg.protocol.viewsPerRotation
-        cfg.protocol.stopViewId = cfg.protocol.viewCount - 1
-        cfg.physics.srcXSampleCount = 1
-        cfg.physics.srcYSampleCount = 1
-        cfg.physics.rowSampleCount = 1
-        cfg.physics.colSampleCount = 1
-        cfg.physics.viewSampleCount = 1
-        
     # Using a 16-slice sim and recon, vary the phantom offset.
-    if experimentName == "08_01_Scanner_16rows_Phantom_offset0":
-        cfg.phantom.centerOffset = [0.0, 0.0, 0.0]    
-    if experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX":
-        cfg.phantom.centerOffset = [50.0, 0.0, 0.0]    
-    if experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY":
-        cfg.phantom.centerOffset = [0.0, 50.0, 0.0]    
-    if experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ":
-        cfg.phantom.centerOffset = [0.0, 0.0, 4.0]    
-    if experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ":
-        cfg.phantom.centerOffset = [0.0, 0.0, 8.0]
+    ExperimentID["08_01_Scanner_16rows_Phantom_offset0"]:                   {"phantom.centerOffset": [0.0, 0.0, 0.0]},
+    ExperimentID["08_02_Scanner_16rows_Phantom_offset+50mmX"]:              {"phantom.centerOffset": [50.0, 0.0, 0.0]},
+    ExperimentID["08_03_Scanner_16rows_Phantom_offset+50mmY"]:              {"phantom.centerOffset": [0.0, 50.0, 0.0]},
+    ExperimentID["08_04_Scanner_16rows_Phantom_offset+4mmZ"]:               {"phantom.centerOffset": [0.0, 0.0, 4.0]},
+    ExperimentID["08_05_Scanner_16rows_Phantom_offset+8mmZ"]:               {"phantom.centerOffset": [0.0, 0.0, 8.0]},
+
+    # Vary the recon offset.
+    ExperimentID["09_01_Scanner_16rows_Recon_0p5mmSlices_offset0"]:         {"recon.centerOffset": [0.0, 0.0, 0.0]},
+    ExperimentID["09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX"]:    {"recon.centerOffset": [22.0, 0.0, 0.0]},
+    ExperimentID["09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY"]:    {"recon.centerOffset": [0.0, 22.0, 0.0]},
+    ExperimentID["09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"]:     {"recon.centerOffset": [0.0, 0.0, 1.0]},
+}
+
+# Some experiments only vary recon parameters, so they share one sim. The leader of each group (see simGroupLeaders)
+# does the sim, and the others run after it and reuse its projection data. If the leader isn't being run, its
+# projection data from an earlier run is reused. Only if there is none does the first one of the group that is run
+# do the sim.
+simGroups = {
+    "02_Physics_NoiseOn_Recon_128mmFOV":                experimentIDs({"02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
+                                                                       "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
+                                                                       "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
+                                                                       "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
+                                                                       "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel"}),
+    "07_Scanner_16rows":                                experimentIDs({"07_01_Scanner_16rows_Recon_1slice",
+                                                                       "07_02_Scanner_16rows_Recon_2slices",
+                                                                       "07_03_Scanner_16rows_Recon_16slices"}),
+    "09_Scanner_16rows_Recon_0p5mmSlices":              experimentIDs({"09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+                                                                       "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+                                                                       "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+                                                                       "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"}),
+}
+
+# The leader of each sim group is its first experiment: 02_01, 07_01 and 09_01.
+simGroupLeaders = {simGroupKey: min(simGroupExperimentIDs) for simGroupKey, simGroupExperimentIDs in simGroups.items()}
+
+
+# Phantom offset experiments with the phantom centered in Z, so symmetrical rows should be exactly the same.
+phantomZCenteredExperimentIDs = experimentIDs({"08_01_Scanner_16rows_Phantom_offset0",
+                                               "08_02_Scanner_16rows_Phantom_offset+50mmX",
+                                               "08_03_Scanner_16rows_Phantom_offset+50mmY"})
+
+# For sims with more than 8 rows, runSim plots all the rows except for these experiments,
+# which plot the rows returned by the function of the row count.
+rowIndicesToPlotTable = {
+    # Plot the first 3 rows, a middle row, and the last 3 rows.
+    **dict.fromkeys(phantomZCenteredExperimentIDs,
+                    lambda rowCount: [0, 1, 2, int(rowCount/2), rowCount-3, rowCount-2, rowCount-1]),
+    # Plot the 2 middle rows.
+    ExperimentID["08_04_Scanner_16rows_Phantom_offset+4mmZ"]: lambda rowCount: [int(rowCount/2)-1, int(rowCount/2)],
+    # Plot the last 4 rows.
+    ExperimentID["08_05_Scanner_16rows_Phantom_offset+8mmZ"]: lambda rowCount: [rowCount-4, rowCount-3, rowCount-2, rowCount-1],
+}
+
+# For the 16-row phantom offset experiments, runSim compares these pairs of rows.
+rowsToDiffTable = {
+    # Confirm that symmetrical rows are exactly the same.
+    **dict.fromkeys(phantomZCenteredExperimentIDs,          np.array([[0, 15], [1, 14], [2, 13]])),
+    # Compare the 4 middle rows.
+    ExperimentID["08_04_Scanner_16rows_Phantom_offset+4mmZ"]: np.array([[7, 8], [8, 9], [9, 10]]),
+    # Compare the last 5 rows.
+    ExperimentID["08_05_Scanner_16rows_Phantom_offset+8mmZ"]: np.array([[11, 12], [12, 13], [13, 14], [14, 15]]),
+}
+
+
+# Window/level formats for each recon unit.
+windowLevelFormats = {
+    'HU':  "W/L = {:.0f}/{:.0f} {:s}; ",
+    '/cm': "W/L = {:.2f}/{:.2f} {:s}; ",
+    '/mm': "W/L = {:.3f}/{:.3f} {:s}; ",
+}
+
+# Recon image titles for groups of experiments. Each entry is (set of experiment IDs, title format,
+# function returning the values for the title format, add slice info to the title?).
+# {wl} in the title format is replaced by the window/level info.
+# Most experiments have only one image, so slice info is only added to the title for multi-slice scans.
+reconImageTitleGroups = [
+    (experimentIDs({"01_01_Baseline",
+                    "01_02_Physics_eNoiseOn",
+                    "01_03_Physics_qNoiseOn",
+                    "01_04_Physics_NoiseOn",
+                    "01_05_Physics_1ebin",
+                    "01_06_Physics_eNoiseOn_1ebin",
+                    "01_07_Physics_qNoiseOn_1ebin",
+                    "01_08_Physics_NoiseOn_1ebin",
+                    "01_09_Physics_Monoenergetic",
+                    "01_10_Physics_eNoiseOn_Monoenergetic",
+                    "01_11_Physics_qNoiseOn_Monoenergetic",
+                    "01_12_Physics_NoiseOn_Monoenergetic"}),
+        "{wl}cfg.physics.monochromatic = {}; cfg.physics.energyCount = {};\n"
+        "cfg.physics.enableElectronicNoise = {}; cfg.protocol.spectrumScaling = {}\n"
+        "cfg.physics.enableQuantumNoise = {}; cfg.protocol.mA = {}; cfg.recon.mu = {}",
+        lambda cfg: (cfg.physics.monochromatic, cfg.physics.energyCount,
+                     cfg.physics.enableElectronicNoise, cfg.protocol.spectrumScaling,
+                     cfg.physics.enableQuantumNoise, cfg.protocol.mA, cfg.recon.mu),
+        False),
+
+    (experimentIDs({"02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
+                    "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
+                    "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
+                    "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
+                    "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel"}),
+        "{wl}cfg.recon.kernelType = {:s}",
+        lambda cfg: (cfg.recon.kernelType,),
+        False),
+
+    (experimentIDs({"03_01_Physics_NoiseOn_Protocol_0p5rotation",
+                    "03_02_Physics_NoiseOn_Protocol_1p0rotation",
+                    "03_03_Physics_NoiseOn_Protocol_2p0rotation"}),
+        "{wl}cfg.protocol.rotationTime = {} s",
+        lambda cfg: (cfg.protocol.rotationTime,),
+        False),
+
+    (experimentIDs({"04_01_Physics_NoiseOn_Protocol_100views",
+                    "04_02_Physics_NoiseOn_Protocol_360views",
+                    "04_03_Physics_NoiseOn_Protocol_1000views"}),
+        "{wl}cfg.protocol.viewsPerRotation = {}",
+        lambda cfg: (cfg.protocol.viewsPerRotation,),
+        False),
+
+    (experimentIDs({"05_01_Physics_SourceSampling1_Recon_128mmFOV",
+                    "05_02_Physics_SourceSampling2_Recon_128mmFOV",
+                    "05_03_Physics_SourceSampling3_Recon_128mmFOV"}),
+        "{wl}cfg.physics.srcXSampleCount = {}",
+        lambda cfg: (cfg.physics.srcXSampleCount,),
+        False),
+
+    (experimentIDs({"05_04_Physics_DetectorSampling1_Recon_128mmFOV",
+                    "05_05_Physics_DetectorSampling2_Recon_128mmFOV",
+                    "05_06_Physics_DetectorSampling3_Recon_128mmFOV"}),
+        "{wl}cfg.physics.colSampleCount = {}",
+        lambda cfg: (cfg.physics.colSampleCount,),
+        False),
+
+    (experimentIDs({"05_07_Physics_ViewSampling1_Recon_300mmFOV",
+                    "05_08_Physics_ViewSampling2_Recon_300mmFOV",
+                    "05_09_Physics_ViewSampling3_Recon_300mmFOV"}),
+        "{wl}cfg.physics.viewSampleCount = {}",
+        lambda cfg: (cfg.physics.viewSampleCount,),
+        False),
+
+    (experimentIDs({"06_00_Scanner_64rows_Physics_NoScatter",
+                    "06_01_Scanner_64rows_Physics_ScatterScale1",
+                    "06_02_Scanner_64rows_Physics_ScatterScale8",
+                    "06_03_Scanner_64rows_Physics_ScatterScale64"}),
+        "{wl}cfg.physics.scatterScaleFactor = {}",
+        lambda cfg: (cfg.physics.scatterScaleFactor,),
+        True),
+
+    (experimentIDs({"07_01_Scanner_16rows_Recon_1slice",
+                    "07_02_Scanner_16rows_Recon_2slices",
+                    "07_03_Scanner_16rows_Recon_16slices"}),
+        "cfg.scanner.detectorRowCount = {}; cfg.recon.sliceCount = {}",
+        lambda cfg: (cfg.scanner.detectorRowCount, cfg.recon.sliceCount),
+        True),
+
+    (experimentIDs({"08_01_Scanner_16rows_Phantom_offset0",
+                    "08_02_Scanner_16rows_Phantom_offset+50mmX",
+                    "08_03_Scanner_16rows_Phantom_offset+50mmY",
+                    "08_04_Scanner_16rows_Phantom_offset+4mmZ",
+                    "08_05_Scanner_16rows_Phantom_offset+8mmZ"}),
+        "cfg.phantom.centerOffset[X, Y, Z] = [{}, {}, {}]",
+        lambda cfg: cfg.phantom.centerOffset[0:3],
+        True),
+
+    (experimentIDs({"09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
+                    "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
+                    "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
+                    "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"}),
+        "cfg.recon.centerOffset[X, Y, Z] = [{}, {}, {}]",
+        lambda cfg: cfg.recon.centerOffset[0:3],
+        True),
+]
 
-    # Using a 16-slice sim and recon with 0.5-mm slices, vary the recon X, Y, and Z offset.
-    if experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX" \
-    or experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY" \
-    or experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ"  \
-    or experimentName == "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0":
-        cfg.recon.sliceThickness = 0.5
-
-    if experimentName == "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0":
-        cfg.recon.centerOffset = [0.0, 0.0, 0.0]    
-    if experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX":
-        cfg.recon.centerOffset = [22.0, 0.0, 0.0]    
-    if experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY":
-        cfg.recon.centerOffset = [0.0, 22.0, 0.0]
-    if experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ":
-        cfg.recon.centerOffset = [0.0, 0.0, 1.0]
-
-    # Only do the sim for the first one. Otherwise, copy the relevant projection data.
-    if experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX" \
-    or experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY" \
-    or experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ":
-        copyFromExperimentName = "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0"
-        copyFromPathname = os.path.join(experimentDirectory,  copyFromExperimentName,  copyFromExperimentName + ".prep")
-        copyToPathname = cfg.resultsName + ".prep"
-        shutil.copy2(copyFromPathname, copyToPathname)
-        cfg.do_Sim = False
+# The same, looked up by experiment ID.
+reconImageTitles = {experimentID: (titleFormat, getTitleValues, addSliceInfo)
+                    for experimentIDSet, titleFormat, getTitleValues, addSliceInfo in reconImageTitleGroups
+                    for experimentID in experimentIDSet}
 
-    cfg.displayWindow = cfg.displayWindowMax - cfg.displayWindowMin
-    cfg.displayLevel = (cfg.displayWindowMax + cfg.displayWindowMin)/2
+
+def setParameters(cfg, parameters):
+    # Set cfg parameters given as {"cfg.path": value}, e.g. {"protocol.mA": 100} sets cfg.protocol.mA = 100.
+
+    for name, value in parameters.items():
+        *path, parameterName = name.split(".")
+        target = cfg
+        for attributeName in path:
+            target = getattr(target, attributeName)
+        # Lists (e.g. centerOffset) are copied so experiments don't share them.
+        if isinstance(value, list):
+            value = list(value)
+        setattr(target, parameterName, value)
+
+
+def setExperimentParameters(cfg):
+
+    experimentID = cfg.experimentID
+
+    # Most experiments use the baseline polyenergetic spectrum and number of energy bins,
+    # but a few use different spectra.
+    # We need to adjust the recon mu values for each spectrum to make water = 0 HU.
+    # The adjusted mu values were determined experimentally by first reconstructing with cgf.recon.mu = 0.02,
+    # measuring water HU in a cental ROI (40 pixels wide, 80 pixels high),
+    # and calculating the mu required to make water = 0 HU using this formula:
+    # cfg.recon.mu = 0.02 + HU(water, measured)*0.02/1000
+
+    # Baseline:
+    cfg.recon.mu = 0.019672
+
+    for experimentIDSet, parameters in experimentGroupParameters:
+        if experimentID in experimentIDSet:
+            setParameters(cfg, parameters)
+
+    if experimentID in experimentParameters:
+        setParameters(cfg, experimentParameters[experimentID])
+
+    # Experiments in the same sim group share their projection data - see simGroups.
+    cfg.simGroupKey = getSimGroupKey(experimentID)
 
     # For single-row simulations, use the native slice thickness.
     if cfg.scanner.detectorRowCount == 1:
         cfg.recon.sliceThickness = cfg.scanner.detectorRowSize*cfg.scanner.sid/cfg.scanner.sdd
+
+    setDerivedParameters(cfg)
     
     return cfg
 
 
+def getSimGroupKey(experimentID):
+    # Returns the sim group of an experiment, or None if it doesn't share its sim - see simGroups.
+
+    for simGroupKey, simGroupExperimentIDs in simGroups.items():
+        if experimentID in simGroupExperimentIDs:
+            return simGroupKey
+
+    return None
+
+
+def setDerivedParameters(cfg):
+    # Set the parameters that are derived from others, after all the experiment parameters are set.
+
+    # One rotation.
+    cfg.protocol.viewCount = cfg.protocol.viewsPerRotation
+    cfg.protocol.stopViewId = cfg.protocol.viewCount - 1
+
+    cfg.displayWindow = cfg.displayWindowMax - cfg.displayWindowMin
+    cfg.displayLevel = (cfg.displayWindowMax + cfg.displayWindowMin)/2
+    # The window/level changed, so clear the cached window/level strings - see WLString().
+    cfg.wlStringCache = {}
+
+
 def WLString(cfg):
     # Used below to create strings with the window/Level info.
+    # The strings are cached on cfg, keyed by the values they depend on.
+
+    key = (cfg.recon.unit, cfg.displayWindow, cfg.displayLevel)
+    if not hasattr(cfg, "wlStringCache"):
+        cfg.wlStringCache = {}
+    if key not in cfg.wlStringCache:
+        cfg.wlStringCache[key] = windowLevelFormats[cfg.recon.unit].format(cfg.displayWindow, cfg.displayLevel, cfg.recon.unit)
 
-    if cfg.recon.unit == 'HU':
-        return "W/L = {:.0f}/{:.0f} {:s}; ".format(cfg.displayWindow, cfg.displayLevel, cfg.recon.unit)
-    if cfg.recon.unit == '/cm':
-        return "W/L = {:.2f}/{:.2f} {:s}; ".format(cfg.displayWindow, cfg.displayLevel, cfg.recon.unit)
-    if cfg.recon.unit == '/mm':
-        return "W/L = {:.3f}/{:.3f} {:s}; ".format(cfg.displayWindow, cfg.displayLevel, cfg.recon.unit)
+    return cfg.wlStringCache[key]
 
 
 def getReconImageTitle(cfg):
 
-    experimentName = cfg.experimentName
-
-    # Most experiments have only one image, so don't add that to the title.
-    cfg.addSliceInfoToReconImageTitle = False
-
-    if experimentName == "01_01_Baseline"                                          \
-    or experimentName == "01_02_Physics_eNoiseOn"                                  \
-    or experimentName == "01_03_Physics_qNoiseOn"                                  \
-    or experimentName == "01_04_Physics_NoiseOn"                                   \
-    or experimentName == "01_05_Physics_1ebin"                                     \
-    or experimentName == "01_06_Physics_eNoiseOn_1ebin"                            \
-    or experimentName == "01_07_Physics_qNoiseOn_1ebin"                            \
-    or experimentName == "01_08_Physics_NoiseOn_1ebin"                             \
-    or experimentName == "01_09_Physics_Monoenergetic"                             \
-    or experimentName == "01_10_Physics_eNoiseOn_Monoenergetic"                    \
-    or experimentName == "01_11_Physics_qNoiseOn_Monoenergetic"                    \
-    or experimentName == "01_12_Physics_NoiseOn_Monoenergetic":
-        formatString = WLString(cfg) + "cfg.physics.monochromatic = {}; cfg.physics.energyCount = {};"
-        string1 = formatString.format(cfg.physics.monochromatic, cfg.physics.energyCount)
-        formatString = "cfg.physics.enableElectronicNoise = {}; cfg.protocol.spectrumScaling = {}"
-        string2 = formatString.format(cfg.physics.enableElectronicNoise, cfg.protocol.spectrumScaling)
-        formatString = "cfg.physics.enableQuantumNoise = {}; cfg.protocol.mA = {}; cfg.recon.mu = {}"
-        string3 = formatString.format(cfg.physics.enableQuantumNoise, cfg.protocol.mA, cfg.recon.mu)
-        return string1 + "\n" + string2 + "\n" + string3
-
-    if experimentName == "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel"           \
-    or experimentName == "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel"           \
-    or experimentName == "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel"          \
-    or experimentName == "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel"      \
-    or experimentName == "02_05_Physics_NoiseOn_Recon_128mmFOV_BoneKernel":
-        formatString = WLString(cfg) + "cfg.recon.kernelType = {:s}"
-        return formatString.format(cfg.recon.kernelType)
-
-    if experimentName == "03_01_Physics_NoiseOn_Protocol_0p5rotation"               \
-    or experimentName == "03_02_Physics_NoiseOn_Protocol_1p0rotation"               \
-    or experimentName == "03_03_Physics_NoiseOn_Protocol_2p0rotation":
-        formatString = WLString(cfg) + "cfg.protocol.rotationTime = {} s"
-        return formatString.format(cfg.protocol.rotationTime)
-
-    if experimentName == "04_01_Physics_NoiseOn_Protocol_100views"                  \
-    or experimentName == "04_02_Physics_NoiseOn_Protocol_360views"                  \
-    or experimentName == "04_03_Physics_NoiseOn_Protocol_1000views":
-        formatString = WLString(cfg) + "cfg.protocol.viewsPerRotation = {}"
-        return formatString.format(cfg.protocol.viewsPerRotation)
-
-    if experimentName == "05_01_Physics_SourceSampling1_Recon_128mmFOV"             \
-    or experimentName == "05_02_Physics_SourceSampling2_Recon_128mmFOV"             \
-    or experimentName == "05_03_Physics_SourceSampling3_Recon_128mmFOV":
-        formatString = WLString(cfg) +  "cfg.physics.srcXSampleCount = {}"
-        return formatString.format(cfg.physics.srcXSampleCount)
-
-    if experimentName == "05_04_Physics_DetectorSampling1_Recon_128mmFOV"           \
-    or experimentName == "05_05_Physics_DetectorSampling2_Recon_128mmFOV"           \
-    or experimentName == "05_06_Physics_DetectorSampling3_Recon_128mmFOV":
-        formatString = WLString(cfg) +  "cfg.physics.colSampleCount = {}"
-        return formatString.format(cfg.physics.colSampleCount)
-
-    if experimentName == "05_07_Physics_ViewSampling1_Recon_300mmFOV"               \
-    or experimentName == "05_08_Physics_ViewSampling2_Recon_300mmFOV"               \
-    or experimentName == "05_09_Physics_ViewSampling3_Recon_300mmFOV":
-        formatString = WLString(cfg) +  "cfg.physics.viewSampleCount = {}"
-        return formatString.format(cfg.physics.viewSampleCount)
-
-    if experimentName == "06_00_Scanner_64rows_Physics_NoScatter"           \
-    or experimentName == "06_01_Scanner_64rows_Physics_ScatterScale1"       \
-    or experimentName == "06_02_Scanner_64rows_Physics_ScatterScale8"       \
-    or experimentName == "06_03_Scanner_64rows_Physics_ScatterScale64":
-        # For multi-slice scans, add slice info to the title.
-        cfg.addSliceInfoToReconImageTitle = True
-        formatString = WLString(cfg) + "cfg.physics.scatterScaleFactor = {}"
-        return formatString.format(cfg.physics.scatterScaleFactor)
-
-    if experimentName == "07_01_Scanner_16rows_Recon_1slice"      \
-    or experimentName == "07_02_Scanner_16rows_Recon_2slices"     \
-    or experimentName == "07_03_Scanner_16rows_Recon_16slices":
-        # For multi-slice scans, add slice info to the title.
-        cfg.addSliceInfoToReconImageTitle = True
-        formatString = "cfg.scanner.detectorRowCount = {}; cfg.recon.sliceCount = {}"
-        return formatString.format(cfg.scanner.detectorRowCount, cfg.recon.sliceCount)
-
-    if experimentName == "08_01_Scanner_16rows_Phantom_offset0"      \
-    or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX" \
-    or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY" \
-    or experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ"  \
-    or experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ":
-        # For multi-slice scans, add slice info to the title.
-        cfg.addSliceInfoToReconImageTitle = True
-        formatString = "cfg.phantom.centerOffset[X, Y, Z] = [{}, {}, {}]"
-        return formatString.format(cfg.phantom.centerOffset[0], cfg.phantom.centerOffset[1], cfg.phantom.centerOffset[2])
-
-    if experimentName == "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0"      \
-    or experimentName == "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX" \
-    or experimentName == "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY" \
-    or experimentName == "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ":
-        # For multi-slice scans, add slice info to the title.
-        cfg.addSliceInfoToReconImageTitle = True
-        formatString = "cfg.recon.centerOffset[X, Y, Z] = [{}, {}, {}]"
-        return formatString.format(cfg.recon.centerOffset[0], cfg.recon.centerOffset[1], cfg.recon.centerOffset[2])
-
-
-def runSim(cfg):
-
-    import numpy as np
-    import matplotlib.pyplot as plt
-
-    experimentName = cfg.experimentName
+    experimentID = cfg.experimentID
+
+    if experimentID not in reconImageTitles:
+        cfg.addSliceInfoToReconImageTitle = False
+        return None
+
+    titleFormat, getTitleValues, cfg.addSliceInfoToReconImageTitle = reconImageTitles[experimentID]
+
+    return titleFormat.format(*getTitleValues(cfg), wl=WLString(cfg))
+
+
+def runSim(cfg, projectionData=None):
+    # Returns the projection data, so experiments in the same sim group can reuse it.
+
+    experimentID = cfg.experimentID
 
     if cfg.do_Sim == True:
         print("**************************")
@@ -485,9 +611,8 @@ def runSim(cfg):
     print("* Plotting selected projections *")
     print("*********************************")
 
-    projectionData = xc.rawread(cfg.resultsName + ".prep",
-                    [cfg.protocol.viewCount, cfg.scanner.detectorRowCount, cfg.scanner.detectorColCount],
-                    'float')
+    if projectionData is None:
+        projectionData = readProjectionData(cfg, cfg.resultsName)
 
     rowCount = cfg.scanner.detectorRowCount
     if rowCount == 1:
@@ -495,86 +620,233 @@ def runSim(cfg):
     elif rowCount <= 8:
         # rowIndicesToPlot = range(8, 16)
         rowIndicesToPlot = range(0, rowCount)
+    elif experimentID in rowIndicesToPlotTable:
+        rowIndicesToPlot = rowIndicesToPlotTable[experimentID](rowCount)
     else:
-        if experimentName == "08_01_Scanner_16rows_Phantom_offset0"       \
-        or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX"  \
-        or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY":
-            # Plot the first 3 rows, a middle row, and the last 3 rows.
-            rowIndicesToPlot = [0, 1, 2, int(rowCount/2), rowCount-3, rowCount-2, rowCount-1]
-        elif experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ":
-            # Plot the 2 middle rows.
-            rowIndicesToPlot = [int(rowCount/2)-1, int(rowCount/2)]
-        elif experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ":
-            # Plot the last 4 rows.
-            rowIndicesToPlot = [rowCount-4, rowCount-3, rowCount-2, rowCount-1]
-        else:
-            rowIndicesToPlot = range(0, rowCount)
-
-    for rowIndexToPlot in rowIndicesToPlot:
-        for viewIndexToPlot in range(0, cfg.protocol.viewCount, int(cfg.protocol.viewCount/4)):
-            viewToPlot = projectionData[viewIndexToPlot, rowIndexToPlot, :]
-            # viewToPlot = np.subtract(projectionData[viewIndexToPlot, rowIndexToPlot, :], projectionData[viewIndexToPlot, 15, :])
-            plt.figure(int(viewIndexToPlot+1))
-            plt.plot(viewToPlot)
-            plt.title("All " + str(cfg.scanner.detectorColCount) + " columns"
-                    + " of row(s) " + str([s + 1 for s in rowIndicesToPlot]) + " of " + str(cfg.scanner.detectorRowCount)
-                    + ", view " + str(viewIndexToPlot+1) + " of " + str(cfg.protocol.viewCount))
-            fileName = cfg.resultsName + "_" + "View_" + str(viewIndexToPlot+1)
-            plt.savefig(fileName, bbox_inches='tight')
-
-    if rowCount == 16:
-        if experimentName == "08_01_Scanner_16rows_Phantom_offset0"       \
-        or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX"  \
-        or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY":
-            # Confirm that symmetrical rows are exactly the same.
-            rowsToDiff = np.array([[0, rowCount-1], [1, rowCount-2], [2, rowCount-3]])
-        elif experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ":
-            # Compare the 4 middle rows.
-            firstRowToDiff = int(rowCount/2 - 1)
-            rowsToDiff = np.array([[firstRowToDiff,   firstRowToDiff+1],
-                                [firstRowToDiff+1, firstRowToDiff+2],
-                                [firstRowToDiff+2, firstRowToDiff+3]])
-        elif experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ":
-            # Compare the last 5 rows.
-            rowsToDiff = np.array([[rowCount-5, rowCount-4],
-                                [rowCount-4, rowCount-3],
-                                [rowCount-3, rowCount-2],
-                                [rowCount-2, rowCount-1]])
-
-        if experimentName == "08_01_Scanner_16rows_Phantom_offset0"       \
-        or experimentName == "08_02_Scanner_16rows_Phantom_offset+50mmX"  \
-        or experimentName == "08_03_Scanner_16rows_Phantom_offset+50mmY"  \
-        or experimentName == "08_04_Scanner_16rows_Phantom_offset+4mmZ"   \
-        or experimentName == "08_05_Scanner_16rows_Phantom_offset+8mmZ":
-            numRowsToDiff = np.shape(rowsToDiff)[0]
-            for rowIndex in range(0, numRowsToDiff):
-                diff = np.subtract(projectionData[0, rowsToDiff[rowIndex, 0], :], projectionData[0, rowsToDiff[rowIndex, 1], :])
-                print("Max diff of rows ", rowsToDiff[rowIndex, 0], " and ", rowsToDiff[rowIndex, 1], " is ", np.max(np.abs(diff)))
-
-    plt.draw()
-    plt.pause(1)
+        rowIndicesToPlot = range(0, rowCount)
+
+    # Gather the selected views and rows into one contiguous array, then plot all the selected rows of each view at once.
+    # Plot 4 evenly spaced views, or every view if there are fewer than 4.
+    viewStride = max(1, cfg.protocol.viewCount // 4)
+    viewIndicesToPlot = list(range(0, cfg.protocol.viewCount, viewStride))
+    viewsToPlot = np.take(np.take(projectionData, viewIndicesToPlot, axis=0), rowIndicesToPlot, axis=1)
+    # Only the view number changes from one title to the next.
+    titleFormat = "All {} columns of row(s) {} of {}, view {{}} of {}".format(
+        cfg.scanner.detectorColCount, [s + 1 for s in rowIndicesToPlot], cfg.scanner.detectorRowCount, cfg.protocol.viewCount)
+    # The figures are left open so they can be displayed below.
+    for viewIndex, viewIndexToPlot in enumerate(viewIndicesToPlot):
+        fig, ax = plt.subplots(num=int(viewIndexToPlot+1))
+        ax.plot(viewsToPlot[viewIndex].T)
+        ax.set_title(titleFormat.format(viewIndexToPlot+1))
+        fileName = cfg.resultsName + "_" + "View_" + str(viewIndexToPlot+1)
+        fig.savefig(fileName, bbox_inches='tight')
+
+    rowsToDiff = rowsToDiffTable.get(experimentID) if rowCount == 16 else None
+    if rowsToDiff is not None:
+        # Diff all the pairs of rows of the first view at once.
+        diffs = np.subtract(projectionData[0, rowsToDiff[:, 0], :], projectionData[0, rowsToDiff[:, 1], :])
+        maxDiffs = np.max(np.abs(diffs, out=diffs), axis=1)
+        for rowPairToDiff, maxDiff in zip(rowsToDiff, maxDiffs):
+            print("Max diff of rows ", rowPairToDiff[0], " and ", rowPairToDiff[1], " is ", maxDiff)
+
+    # The plots were saved to files above. Only display them if waiting for a keypress.
     if cfg.waitForKeypress:
+        plt.draw()
+        plt.pause(1)
         print("*******************************************")
         print("* Press Enter to close plots and continue *")
         input("*******************************************")
     
     plt.close('all')
 
+    return projectionData
+
+
+def readProjectionData(cfg, resultsName):
+    # Only a few views and rows are plotted, so memory-map the projection data rather than reading all of it.
 
-def runRecon(cfg):
+    return np.memmap(resultsName + ".prep", dtype=np.single, mode='r',
+                     shape=(cfg.protocol.viewCount, cfg.scanner.detectorRowCount, cfg.scanner.detectorColCount))
+
+
+def runRecon(cfg, projectionData=None):
 
     print("******************************")
     print("* Running the reconstruction *")
     print("******************************")
 
-    cfg = recon.recon(cfg)
+    cfg = recon.recon(cfg, projectionData)
 
     return cfg
 
 
+def cloneCfg(base):
+    # Clone the base cfg for one experiment - much cheaper than copy.deepcopy(base).
+    # The cfg and its groups of parameters (protocol, scanner, sim, ...) are copied, including any lists in them,
+    # but nothing deeper. This is enough because experiments only ever assign parameters - never change them in place.
+
+    cfg = copy.copy(base)
+    cfg.cfg = copy.copy(base.cfg)
+    for groupName, group in vars(base.cfg).items():
+        if isinstance(group, xc.pyfiles.CommonTools.emptyCFG):
+            group = copy.copy(group)
+            vars(group).update({name: list(value) for name, value in vars(group).items() if isinstance(value, list)})
+            setattr(cfg.cfg, groupName, group)
+    # cfg.protocol, cfg.scanner, etc. are the same objects as cfg.cfg.protocol, cfg.cfg.scanner, etc.
+    cfg.cfg_to_self(cfg.cfg)
+
+    return cfg
+
+
+def getResultsName(experimentName):
+
+    return os.path.join(experimentDirectory, experimentName, experimentName)
+
+
+def copyProjectionData(simResultsName, resultsName):
+    # Put the projection data from another experiment in this experiment's folder, so this experiment can be re-run
+    # later with do_Sim = False. This is a real copy, not a hard link: the sim rewrites its .prep file in place,
+    # so re-running the leader would otherwise change the projection data of the followers from earlier runs.
+
+    # Remove an existing file first, in case it is still hard linked to the leader's file.
+    copyToPathname = resultsName + ".prep"
+    if os.path.exists(copyToPathname):
+        os.remove(copyToPathname)
+    shutil.copy2(simResultsName + ".prep", copyToPathname)
+
+
+def runExperiment(base, experimentName, simResultsName=None):
+    # Run one experiment, starting from the base cfg.
+    # If simResultsName is given, use the projection data from that experiment rather than running the sim.
+    # Returns the results name, so other experiments in the same sim group can use its projection data.
+
+    cfg = cloneCfg(base)
+    resultsPath = os.path.dirname(getResultsName(experimentName))
+    
+    print("**************************")
+    print("* Experiment: {:s}".format(experimentName))
+    print("**************************")
+
+    # Create the results folder if it doesn't exist. This is safe when experiments run in parallel.
+    os.makedirs(resultsPath, exist_ok=True)
+    cfg.resultsName = getResultsName(experimentName)
+
+    # Define the specific parameters for this experiment.
+    cfg.experimentName = experimentName
+    cfg.experimentID = ExperimentID[experimentName]
+    cfg = setExperimentParameters(cfg)
+    # Get the title for the recon images.
+    cfg.reconImageTitle = getReconImageTitle(cfg)
+    # Run the simulation, unless another experiment in the same sim group already did.
+    projectionData = None
+    if simResultsName is not None:
+        cfg.do_Sim = False
+        copyProjectionData(simResultsName, cfg.resultsName)
+        projectionData = readProjectionData(cfg, cfg.resultsName)
+    projectionData = runSim(cfg, projectionData)
+    # Run the recon.
+    cfg = runRecon(cfg, projectionData)
+
+    return cfg.resultsName
+
+
+def runPickledExperiment(pickledBase, experimentName, simResultsName=None):
+    # Used by the worker processes, so the base cfg is pickled once rather than for each experiment.
+
+    # Plots are only saved to files in the worker processes, so don't use an interactive backend.
+    plt.switch_backend("Agg")
+
+    # The C lib isn't pickled with the base cfg, so load it in this process.
+    base = pickle.loads(pickledBase)
+    base.cfg.clib = xc.pyfiles.CommonTools.load_C_lib()
+
+    return runExperiment(base, experimentName, simResultsName)
+
+
+def getSimSources(experimentNames):
+    # For each sim group in experimentNames, find where its projection data comes from - see simGroups.
+    # Returns the experiment that does the sim for each group that needs one,
+    # and the results name of the earlier sim for each group that reuses one.
+
+    simRunners = {}
+    simResultsNames = {}
+    for experimentName in experimentNames:
+        simGroupKey = getSimGroupKey(ExperimentID[experimentName])
+        if simGroupKey is None or simGroupKey in simRunners or simGroupKey in simResultsNames:
+            continue
+        leaderName = simGroupLeaders[simGroupKey].name
+        if leaderName in experimentNames:
+            simRunners[simGroupKey] = leaderName
+        elif os.path.isfile(getResultsName(leaderName) + ".prep"):
+            simResultsNames[simGroupKey] = getResultsName(leaderName)
+        else:
+            simRunners[simGroupKey] = experimentName
+
+    return simRunners, simResultsNames
+
+
+def runExperiments(base, experimentNames):
+    # Run the experiments, base.experimentWorkerCount at a time.
+    # The experiment that does the sim for a sim group runs before the others in the group - see simGroups.
+
+    workerCount = base.experimentWorkerCount
+    if workerCount == 0:
+        # Each sim uses phantom.projectorNumThreads threads, so run as many experiments as that leaves CPUs for.
+        workerCount = max(1, os.cpu_count() // base.phantom.projectorNumThreads)
+    workerCount = min(workerCount, len(experimentNames))
+
+    simRunners, simResultsNames = getSimSources(experimentNames)
+    # The other experiments of the sim groups that need a sim wait for it.
+    simGroupFollowers = {simGroupKey: [] for simGroupKey in simRunners}
+
+    if workerCount <= 1:
+        for experimentName in experimentNames:
+            simGroupKey = getSimGroupKey(ExperimentID[experimentName])
+            if simGroupKey in simGroupFollowers and experimentName != simRunners[simGroupKey]:
+                simGroupFollowers[simGroupKey].append(experimentName)
+                continue
+            resultsName = runExperiment(base, experimentName, simResultsNames.get(simGroupKey))
+            if simGroupKey in simGroupFollowers:
+                # The rest of the sim group, listed before or after this experiment, uses its projection data.
+                simResultsNames[simGroupKey] = resultsName
+                for followerName in simGroupFollowers.pop(simGroupKey):
+                    runExperiment(base, followerName, resultsName)
+        return
+
+    # Plots can't be displayed or waited for in the worker processes.
+    base.waitForKeypress = False
+    base.recon.displayImagePictures = False
+    # The C lib can't be pickled, so leave it out - runPickledExperiment loads it in each worker.
+    clib = base.cfg.clib
+    del base.cfg.clib
+    pickledBase = pickle.dumps(base, protocol=pickle.HIGHEST_PROTOCOL)
+    base.cfg.clib = clib
+
+    with ProcessPoolExecutor(max_workers=workerCount) as executor:
+        # Start the experiments that don't wait for a sim. The rest of each sim group waits for the one doing its sim.
+        futures = {}
+        for experimentName in experimentNames:
+            simGroupKey = getSimGroupKey(ExperimentID[experimentName])
+            if simGroupKey in simGroupFollowers and experimentName != simRunners[simGroupKey]:
+                simGroupFollowers[simGroupKey].append(experimentName)
+                continue
+            future = executor.submit(runPickledExperiment, pickledBase, experimentName, simResultsNames.get(simGroupKey))
+            futures[future] = simGroupKey
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                simGroupKey = futures.pop(future)
+                resultsName = future.result()
+                for experimentName in simGroupFollowers.pop(simGroupKey, []):
+                    futures[executor.submit(runPickledExperiment, pickledBase, experimentName, resultsName)] = None
+
+
+@functools.lru_cache(maxsize=1)
 def getUserPath():
 
     # Get the user-specified environment variable.
+    # It's only checked the first time - the result is cached for the rest of the run.
     userPath = os.environ.get('XCIST_UserPath')
 
     if userPath is None:
@@ -616,8 +888,7 @@ cfg.physics.enableElectronicNoise = 0
 cfg.physics.energyCount = 12 # Using 120 kVp, so 10 kV/bin.
 
 cfg.protocol.viewsPerRotation = 1000 # 360 is about the minimum to get minor aliasing, but need 1000 for minimal aliasing.
-cfg.protocol.viewCount = cfg.protocol.viewsPerRotation
-cfg.protocol.stopViewId = cfg.protocol.viewCount - 1
+                                     # viewCount and stopViewId are set from this - see setDerivedParameters().
 cfg.protocol.spectrumScaling = 0.931
 cfg.protocol.mA = 300
 
@@ -631,9 +902,15 @@ cfg.recon.saveSingleImages = True
 cfg.waitForKeypress = False             # Wait for keypress after plot display?
 cfg.do_Sim = True                       # The simulation is usually run except when only varying recon parameters.
 cfg.do_Recon = True                     # The recon is usually run except when only varying display parameters.
+cfg.experimentWorkerCount = 1           # Number of experiments to run at the same time, each in its own process.
+                                        # 0 to use as many as there are CPUs for - see runExperiments().
 cfg.displayWindowMin = -200             # In HU.
 cfg.displayWindowMax = 200              # In HU.
 
+# If nothing is displayed on screen, don't use an interactive plotting backend.
+if not cfg.waitForKeypress and not cfg.recon.displayImagePictures:
+    plt.switch_backend("Agg")
+
 ##--------- Define experiment names
 
 # The following variable sets up all relevant parameters for experiments designed to evaluate XCIST using the CatSim logo phantom.
@@ -653,7 +930,7 @@ experimentNames = [
     # "01_11_Physics_qNoiseOn_Monoenergetic",
     # "01_12_Physics_NoiseOn_Monoenergetic",
 
-    # "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel", # Needs to be done before the next 4 because those use projections from this.
+    # "02_01_Physics_NoiseOn_Recon_128mmFOV_R-LKernel",
     # "02_02_Physics_NoiseOn_Recon_128mmFOV_S-LKernel",
     # "02_03_Physics_NoiseOn_Recon_128mmFOV_SoftKernel",
     # "02_04_Physics_NoiseOn_Recon_128mmFOV_StandardKernel",
@@ -692,36 +969,14 @@ experimentNames = [
     # "08_04_Scanner_16rows_Phantom_offset+4mmZ",
     # "08_05_Scanner_16rows_Phantom_offset+8mmZ",
 
-    # "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",  # Needs to be done before the next 3 because those use projections from this.
+    # "09_01_Scanner_16rows_Recon_0p5mmSlices_offset0",
     # "09_02_Scanner_16rows_Recon_0p5mmSlices_offset+22mmX",
     # "09_03_Scanner_16rows_Recon_0p5mmSlices_offset+22mmY",
     # "09_04_Scanner_16rows_Recon_0p5mmSlices_offset+1mmZ",
 ]
 
-# The current config is the base config, and will be used as the basis each time through the loop.
+# The current config is the base config, and will be used as the basis for each experiment.
 base = copy.deepcopy(cfg) 
 
-for experimentIndex in range(0, len(experimentNames)):
-
-    cfg = copy.deepcopy(base)
-    experimentName = experimentNames[experimentIndex]
-    resultsPath = os.path.join(experimentDirectory, experimentName)
-    
-    print("**************************")
-    print("* Experiment: {:s}".format(experimentName))
-    print("**************************")
-
-    # Create the results folder if it doesn't exist.
-    if not os.path.exists(resultsPath):
-        os.makedirs(resultsPath)
-    cfg.resultsName = os.path.join(resultsPath, experimentName)
-
-    # Define the specific parameters for this experiment.
-    cfg.experimentName = experimentName
-    cfg = setExperimentParameters(cfg)
-    # Get the title for the recon images.
-    cfg.reconImageTitle = getReconImageTitle(cfg)
-    # Run the simulation.
-    runSim(cfg)
-    # Run the recon.
-    cfg = runRecon(cfg)
+if __name__ == "__main__":
+    runExperiments(base, experimentNames)
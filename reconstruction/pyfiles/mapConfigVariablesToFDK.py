@@ -1,5 +1,11 @@
+from collections import namedtuple
 from math import ceil
 
+# The FDK recon parameters, in the order the FDK recon unpacks them.
+FDKParams = namedtuple("FDKParams", [
+    "sid", "sdd", "nMod", "rowSize", "modWidth", "dectorYoffset", "dectorZoffset",
+    "fov", "imageSize", "sliceCount", "sliceThickness", "centerOffset", "phantomOffset", "startView", "kernelType"])
+
 def mapConfigVariablesToFDK(cfg):
 
     sid = cfg.scanner.sid
@@ -17,17 +23,24 @@ def mapConfigVariablesToFDK(cfg):
     centerOffset = cfg.recon.centerOffset
     phantomOffset = cfg.phantom.centerOffset
 
+    startView = startAngleToStartView(cfg.protocol.viewCount, cfg.recon.startAngle)
+
+    kernelType = cfg.recon.kernelType
+
+    return FDKParams(sid, sdd, nMod, rowSize, modWidth, dectorYoffset, dectorZoffset,
+                     fov, imageSize, sliceCount, sliceThickness, centerOffset, phantomOffset, startView, kernelType)
+
+
+def startAngleToStartView(viewCount, startAngle):
+
     # The FDK recon seems to be using a "start view" rather than a "start angele".
     # This is a hack until that gets fixed.
-    startView_at_view_angle_equals_0 = cfg.protocol.viewCount/2
-    if cfg.recon.startAngle <= 180:
-        startView = startView_at_view_angle_equals_0 + int(cfg.protocol.viewCount*cfg.recon.startAngle/360)
-    elif cfg.recon.startAngle > 180:
-        startView = startView_at_view_angle_equals_0 - int(cfg.protocol.viewCount*cfg.recon.startAngle/360)
-    else:
-        raise Exception("******** Error! Invalid start angle = {} specified. ********".format(cfg.recon.startAngle))
+    # This also rejects NaN.
+    if not 0 <= startAngle <= 360:
+        raise Exception("******** Error! Invalid start angle = {} specified. ********".format(startAngle))
 
-    kernelType = cfg.recon.kernelType
+    # Offset from the view at view angle 0, counting backwards for start angles past 180.
+    offset = int(viewCount*(startAngle if startAngle <= 180 else -startAngle)/360)
+    startView = viewCount/2 + offset
 
-    return sid, sdd, nMod, rowSize, modWidth, dectorYoffset, dectorZoffset, \
-           fov, imageSize, sliceCount, sliceThickness, centerOffset, phantomOffset, startView, kernelType
+    return startView
@@ -7,11 +7,12 @@ import numpy as np
 # Need to import new recons as they are added
 
 
-def recon(cfg):
+def recon(cfg, prep=None):
 
-    # If doing the recon, load the projection data, do the recon, and save the resulting image volume.
+    # If doing the recon, load the projection data (unless it was passed in), do the recon, and save the resulting image volume.
     if cfg.do_Recon:
-        prep = load_prep(cfg)
+        if prep is None:
+            prep = load_prep(cfg)
 
         # The following line doesn't work - need to fix it when new recons are added.
         # imageVolume3D = feval("reconstruction." + cfg.recon.reconType, cfg, prep)